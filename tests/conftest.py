@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 from click.testing import CliRunner
 
@@ -9,8 +11,13 @@ def cli():
         yield runner
 
 
+@pytest.fixture(scope="session")
+def scratch_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("dotenv_tests")
+
+
 @pytest.fixture
-def dotenv_path(tmp_path):
-    path = tmp_path / '.env'
+def dotenv_path(scratch_dir):
+    path = scratch_dir / f"env_{uuid.uuid4().hex}"
     path.write_bytes(b'')
     yield path
@@ -10,12 +10,12 @@ pytest.importorskip("IPython")
 
 
 @mock.patch.dict(os.environ, {}, clear=True)
-def test_ipython_existing_variable_no_override(tmp_path):
+def test_ipython_existing_variable_no_override(tmp_path, monkeypatch):
     from IPython.terminal.embed import InteractiveShellEmbed
 
     dotenv_file = tmp_path / ".env"
     dotenv_file.write_text("a=b\n")
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
     os.environ["a"] = "c"
 
     ipshell = InteractiveShellEmbed()
@@ -26,12 +26,12 @@ def test_ipython_existing_variable_no_override(tmp_path):
 
 
 @mock.patch.dict(os.environ, {}, clear=True)
-def test_ipython_existing_variable_override(tmp_path):
+def test_ipython_existing_variable_override(tmp_path, monkeypatch):
     from IPython.terminal.embed import InteractiveShellEmbed
 
     dotenv_file = tmp_path / ".env"
     dotenv_file.write_text("a=b\n")
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
     os.environ["a"] = "c"
 
     ipshell = InteractiveShellEmbed()
@@ -42,12 +42,12 @@ def test_ipython_existing_variable_override(tmp_path):
 
 
 @mock.patch.dict(os.environ, {}, clear=True)
-def test_ipython_new_variable(tmp_path):
+def test_ipython_new_variable(tmp_path, monkeypatch):
     from IPython.terminal.embed import InteractiveShellEmbed
 
     dotenv_file = tmp_path / ".env"
     dotenv_file.write_text("a=b\n")
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
 
     ipshell = InteractiveShellEmbed()
     ipshell.run_line_magic("load_ext", "dotenv")
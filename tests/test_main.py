@@ -1,62 +1,76 @@
 import io
 import logging
 import os
-import sys
+import runpy
 import textwrap
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Optional, Tuple
 from unittest import mock
 
 import pytest
 
-try:
-    import sh
-    with_sh = True
-except ImportError:
-    with_sh = False
-
 from .utils import as_env
 
 import dotenv
 
+LOGGER = logging.getLogger("dotenv.main")
+
+
+@lru_cache(maxsize=None)
+def _env(**items):
+    return MappingProxyType(as_env(items))
+
+
+@pytest.fixture
+def warn_mock():
+    with mock.patch.object(LOGGER, "warning") as m:
+        yield m
 
-def test_set_key_no_file(tmp_path):
+
+@pytest.fixture
+def info_mock():
+    with mock.patch.object(LOGGER, "info") as m:
+        yield m
+
+
+def test_set_key_no_file(tmp_path, warn_mock):
     nx_path = tmp_path / "nx"
-    logger = logging.getLogger("dotenv.main")
 
-    with mock.patch.object(logger, "warning"):
-        result = dotenv.set_key(nx_path, "foo", "bar")
+    result = dotenv.set_key(nx_path, "foo", "bar")
 
     assert result == (True, "foo", "bar")
     assert nx_path.exists()
 
 
-@pytest.mark.parametrize(
-    "before,key,value,expected,after",
-    [
-        ("", "a", "", (True, "a", ""), "a=''\n"),
-        ("", "a", "b", (True, "a", "b"), "a='b'\n"),
-        ("", "a", "'b'", (True, "a", "'b'"), "a='\\'b\\''\n"),
-        ("", "a", "\"b\"", (True, "a", '"b"'), "a='\"b\"'\n"),
-        ("", "a", "b'c", (True, "a", "b'c"), "a='b\\'c'\n"),
-        ("", "a", "b\"c", (True, "a", "b\"c"), "a='b\"c'\n"),
-        ("a=b", "a", "c", (True, "a", "c"), "a='c'\n"),
-        ("a=b\n", "a", "c", (True, "a", "c"), "a='c'\n"),
-        ("a=b\n\n", "a", "c", (True, "a", "c"), "a='c'\n\n"),
-        ("a=b\nc=d", "a", "e", (True, "a", "e"), "a='e'\nc=d"),
-        ("a=b\nc=d\ne=f", "c", "g", (True, "c", "g"), "a=b\nc='g'\ne=f"),
-        ("a=b\n", "c", "d", (True, "c", "d"), "a=b\nc='d'\n"),
-        ("a=b", "c", "d", (True, "c", "d"), "a=b\nc='d'\n"),
-    ],
+SET_KEY_CASES = (
+    ("", "a", "", (True, "a", ""), "a=''\n"),
+    ("", "a", "b", (True, "a", "b"), "a='b'\n"),
+    ("", "a", "'b'", (True, "a", "'b'"), "a='\\'b\\''\n"),
+    ("", "a", "\"b\"", (True, "a", '"b"'), "a='\"b\"'\n"),
+    ("", "a", "b'c", (True, "a", "b'c"), "a='b\\'c'\n"),
+    ("", "a", "b\"c", (True, "a", "b\"c"), "a='b\"c'\n"),
+    ("a=b", "a", "c", (True, "a", "c"), "a='c'\n"),
+    ("a=b\n", "a", "c", (True, "a", "c"), "a='c'\n"),
+    ("a=b\n\n", "a", "c", (True, "a", "c"), "a='c'\n\n"),
+    ("a=b\nc=d", "a", "e", (True, "a", "e"), "a='e'\nc=d"),
+    ("a=b\nc=d\ne=f", "c", "g", (True, "c", "g"), "a=b\nc='g'\ne=f"),
+    ("a=b\n", "c", "d", (True, "c", "d"), "a=b\nc='d'\n"),
+    ("a=b", "c", "d", (True, "c", "d"), "a=b\nc='d'\n"),
 )
-def test_set_key(dotenv_path, before, key, value, expected, after):
-    logger = logging.getLogger("dotenv.main")
-    dotenv_path.write_text(before)
 
-    with mock.patch.object(logger, "warning") as mock_warning:
+
+def test_set_key_table(dotenv_path, warn_mock):
+    for before, key, value, expected, after in SET_KEY_CASES:
+        dotenv_path.write_bytes(before.encode())
+
         result = dotenv.set_key(dotenv_path, key, value)
 
-    assert result == expected
-    assert dotenv_path.read_text() == after
-    mock_warning.assert_not_called()
+        assert result == expected
+        # set_key writes in text mode, so newlines come back as os.linesep.
+        assert dotenv_path.read_bytes() == after.replace("\n", os.linesep).encode(), before
+
+    warn_mock.assert_not_called()
 
 
 def test_set_key_encoding(dotenv_path):
@@ -71,53 +85,63 @@ def test_set_key_encoding(dotenv_path):
 def test_set_key_permission_error(dotenv_path):
     dotenv_path.chmod(0o000)
 
-    with pytest.raises(Exception):
+    with pytest.raises(PermissionError):
         dotenv.set_key(dotenv_path, "a", "b")
 
     dotenv_path.chmod(0o600)
     assert dotenv_path.read_text() == ""
 
 
-def test_get_key_no_file(tmp_path):
+def test_get_key_no_file(tmp_path, warn_mock, info_mock):
     nx_path = tmp_path / "nx"
-    logger = logging.getLogger("dotenv.main")
 
-    with mock.patch.object(logger, "info") as mock_info, \
-            mock.patch.object(logger, "warning") as mock_warning:
-        result = dotenv.get_key(nx_path, "foo")
+    result = dotenv.get_key(nx_path, "foo")
 
     assert result is None
-    mock_info.assert_has_calls(
+    info_mock.assert_has_calls(
         calls=[
             mock.call("Python-dotenv could not find configuration file %s.", nx_path)
         ],
     )
-    mock_warning.assert_has_calls(
+    warn_mock.assert_has_calls(
         calls=[
             mock.call("Key %s not found in %s.", "foo", nx_path)
         ],
     )
 
 
-def test_get_key_not_found(dotenv_path):
-    logger = logging.getLogger("dotenv.main")
-
-    with mock.patch.object(logger, "warning") as mock_warning:
-        result = dotenv.get_key(dotenv_path, "foo")
+def test_get_key_not_found(dotenv_path, warn_mock):
+    result = dotenv.get_key(dotenv_path, "foo")
 
     assert result is None
-    mock_warning.assert_called_once_with("Key %s not found in %s.", "foo", dotenv_path)
+    warn_mock.assert_called_once_with("Key %s not found in %s.", "foo", dotenv_path)
 
 
-def test_get_key_ok(dotenv_path):
-    logger = logging.getLogger("dotenv.main")
+def test_get_key_ok(dotenv_path, warn_mock):
     dotenv_path.write_text("foo=bar")
 
-    with mock.patch.object(logger, "warning") as mock_warning:
-        result = dotenv.get_key(dotenv_path, "foo")
+    result = dotenv.get_key(dotenv_path, "foo")
 
     assert result == "bar"
-    mock_warning.assert_not_called()
+    warn_mock.assert_not_called()
+
+
+GET_KEY_STREAM_CASES = (
+    ("foo=bar", "foo", "bar"),
+    ("foo=bar\n", "foo", "bar"),
+    ("a=b\nfoo=bar", "foo", "bar"),
+    ("foo='bar'", "foo", "bar"),
+    ("foo", "foo", None),
+    ("foo=", "foo", ""),
+)
+
+
+@pytest.mark.parametrize("before,key,expected", GET_KEY_STREAM_CASES)
+def test_get_key_stream(before, key, expected, warn_mock):
+    result = dotenv.main.DotEnv(None, stream=io.StringIO(before), verbose=True).get(key)
+
+    assert result == expected
+    warn_mock.assert_not_called()
 
 
 def test_get_key_encoding(dotenv_path):
@@ -129,39 +153,33 @@ def test_get_key_encoding(dotenv_path):
     assert result == "è"
 
 
-def test_get_key_none(dotenv_path):
-    logger = logging.getLogger("dotenv.main")
+def test_get_key_none(dotenv_path, warn_mock):
     dotenv_path.write_text("foo")
 
-    with mock.patch.object(logger, "warning") as mock_warning:
-        result = dotenv.get_key(dotenv_path, "foo")
+    result = dotenv.get_key(dotenv_path, "foo")
 
     assert result is None
-    mock_warning.assert_not_called()
+    warn_mock.assert_not_called()
 
 
-def test_unset_with_value(dotenv_path):
-    logger = logging.getLogger("dotenv.main")
+def test_unset_with_value(dotenv_path, warn_mock):
     dotenv_path.write_text("a=b\nc=d")
 
-    with mock.patch.object(logger, "warning") as mock_warning:
-        result = dotenv.unset_key(dotenv_path, "a")
+    result = dotenv.unset_key(dotenv_path, "a")
 
     assert result == (True, "a")
     assert dotenv_path.read_text() == "c=d"
-    mock_warning.assert_not_called()
+    warn_mock.assert_not_called()
 
 
-def test_unset_no_value(dotenv_path):
-    logger = logging.getLogger("dotenv.main")
+def test_unset_no_value(dotenv_path, warn_mock):
     dotenv_path.write_text("foo")
 
-    with mock.patch.object(logger, "warning") as mock_warning:
-        result = dotenv.unset_key(dotenv_path, "foo")
+    result = dotenv.unset_key(dotenv_path, "foo")
 
     assert result == (True, "foo")
     assert dotenv_path.read_text() == ""
-    mock_warning.assert_not_called()
+    warn_mock.assert_not_called()
 
 
 def test_unset_encoding(dotenv_path):
@@ -174,72 +192,73 @@ def test_unset_encoding(dotenv_path):
     assert dotenv_path.read_text(encoding=encoding) == ""
 
 
-def test_set_key_unauthorized_file(dotenv_path):
-    dotenv_path.chmod(0o000)
-
-    with pytest.raises(PermissionError):
-        dotenv.set_key(dotenv_path, "a", "x")
-
-
-def test_unset_non_existent_file(tmp_path):
+def test_unset_non_existent_file(tmp_path, warn_mock):
     nx_path = tmp_path / "nx"
-    logger = logging.getLogger("dotenv.main")
 
-    with mock.patch.object(logger, "warning") as mock_warning:
-        result = dotenv.unset_key(nx_path, "foo")
+    result = dotenv.unset_key(nx_path, "foo")
 
     assert result == (None, "foo")
-    mock_warning.assert_called_once_with(
+    warn_mock.assert_called_once_with(
         "Can't delete from %s - it doesn't exist.",
         nx_path,
     )
 
 
-def prepare_file_hierarchy(path):
+@pytest.fixture(scope="session")
+def hierarchy(tmp_path_factory):
     """
-    Create a temporary folder structure like the following:
+    Create a temporary folder structure like the following, once per session:
 
-        test_find_dotenv0/
+        h0/
         └── child1
-            ├── child2
-            │   └── child3
-            │       └── child4
-            └── .env
+            └── child2
+                └── child3
+                    └── child4
 
-    Then try to automatically `find_dotenv` starting in `child4`
+    Tests then try to automatically `find_dotenv` starting in `child4`.
     """
+    root = tmp_path_factory.mktemp("h")
+    leaf = root / "child1" / "child2" / "child3" / "child4"
+    leaf.mkdir(parents=True)
+    return root, leaf
+
 
-    leaf = path / "child1" / "child2" / "child3" / "child4"
-    leaf.mkdir(parents=True, exist_ok=True)
-    return leaf
+@pytest.fixture
+def hierarchy_dotenv(hierarchy):
+    root, _ = hierarchy
+    dotenv_path = root / ".env"
+    dotenv_path.write_bytes(b"TEST=test\n")
+    yield dotenv_path
+    dotenv_path.unlink()
 
 
-def test_find_dotenv_no_file_raise(tmp_path):
-    leaf = prepare_file_hierarchy(tmp_path)
-    os.chdir(leaf)
+@pytest.mark.xdist_group("cwd")
+def test_find_dotenv_no_file_raise(hierarchy, monkeypatch):
+    _, leaf = hierarchy
+    monkeypatch.chdir(leaf)
 
     with pytest.raises(IOError):
         dotenv.find_dotenv(raise_error_if_not_found=True, usecwd=True)
 
 
-def test_find_dotenv_no_file_no_raise(tmp_path):
-    leaf = prepare_file_hierarchy(tmp_path)
-    os.chdir(leaf)
+@pytest.mark.xdist_group("cwd")
+def test_find_dotenv_no_file_no_raise(hierarchy, monkeypatch):
+    _, leaf = hierarchy
+    monkeypatch.chdir(leaf)
 
     result = dotenv.find_dotenv(usecwd=True)
 
     assert result == ""
 
 
-def test_find_dotenv_found(tmp_path):
-    leaf = prepare_file_hierarchy(tmp_path)
-    os.chdir(leaf)
-    dotenv_path = tmp_path / ".env"
-    dotenv_path.write_bytes(b"TEST=test\n")
+@pytest.mark.xdist_group("cwd")
+def test_find_dotenv_found(hierarchy, hierarchy_dotenv, monkeypatch):
+    _, leaf = hierarchy
+    monkeypatch.chdir(leaf)
 
     result = dotenv.find_dotenv(usecwd=True)
 
-    assert result == str(dotenv_path)
+    assert result == str(hierarchy_dotenv)
 
 
 @mock.patch.dict(os.environ, {}, clear=True)
@@ -249,17 +268,15 @@ def test_load_dotenv_existing_file(dotenv_path):
     result = dotenv.load_dotenv(dotenv_path)
 
     assert result is True
-    assert os.environ == as_env({"a": "b"})
+    assert len(os.environ) == 1
+    assert os.environ.get("a") == "b"
 
 
-def test_load_dotenv_no_file_verbose():
-    logger = logging.getLogger("dotenv.main")
-
-    with mock.patch.object(logger, "info") as mock_info:
-        result = dotenv.load_dotenv('.does_not_exist', verbose=True)
+def test_load_dotenv_no_file_verbose(info_mock):
+    result = dotenv.load_dotenv('.does_not_exist', verbose=True)
 
     assert result is False
-    mock_info.assert_called_once_with("Python-dotenv could not find configuration file %s.", ".does_not_exist")
+    info_mock.assert_called_once_with("Python-dotenv could not find configuration file %s.", ".does_not_exist")
 
 
 @mock.patch.dict(os.environ, {"a": "c"}, clear=True)
@@ -269,7 +286,8 @@ def test_load_dotenv_existing_variable_no_override(dotenv_path):
     result = dotenv.load_dotenv(dotenv_path, override=False)
 
     assert result is True
-    assert os.environ == as_env({"a": "c"})
+    assert len(os.environ) == 1
+    assert os.environ.get("a") == "c"
 
 
 @mock.patch.dict(os.environ, {"a": "c"}, clear=True)
@@ -279,7 +297,8 @@ def test_load_dotenv_existing_variable_override(dotenv_path):
     result = dotenv.load_dotenv(dotenv_path, override=True)
 
     assert result is True
-    assert os.environ == as_env({"a": "b"})
+    assert len(os.environ) == 1
+    assert os.environ.get("a") == "b"
 
 
 @mock.patch.dict(os.environ, {"a": "c"}, clear=True)
@@ -292,9 +311,9 @@ def test_load_dotenv_redefine_var_used_in_file_no_override(dotenv_path):
     if os.name == 'nt':
         # Variable is not overwritten, but variable expansion
         # uses the lowercase variable that was just defined in the file.
-        assert os.environ == as_env({"a": "c", "d": "b"})
+        assert os.environ == _env(a="c", d="b")
     else:
-        assert os.environ == as_env({"a": "c", "d": "c"})
+        assert os.environ == _env(a="c", d="c")
 
 
 @mock.patch.dict(os.environ, {"a": "c"}, clear=True)
@@ -304,7 +323,7 @@ def test_load_dotenv_redefine_var_used_in_file_with_override(dotenv_path):
     result = dotenv.load_dotenv(dotenv_path, override=True)
 
     assert result is True
-    assert os.environ == as_env({"a": "b", "d": "b"})
+    assert os.environ == _env(a="b", d="b")
 
 
 @mock.patch.dict(os.environ, {}, clear=True)
@@ -314,7 +333,8 @@ def test_load_dotenv_string_io_utf_8():
     result = dotenv.load_dotenv(stream=stream)
 
     assert result is True
-    assert os.environ == as_env({"a": "à"})
+    assert len(os.environ) == 1
+    assert os.environ.get("a") == "à"
 
 
 @mock.patch.dict(os.environ, {}, clear=True)
@@ -325,26 +345,26 @@ def test_load_dotenv_file_stream(dotenv_path):
         result = dotenv.load_dotenv(stream=f)
 
     assert result is True
-    assert os.environ == as_env({"a": "b"})
+    assert len(os.environ) == 1
+    assert os.environ.get("a") == "b"
 
 
-@pytest.mark.skipif(not with_sh, reason="sh module is not available")
-def test_load_dotenv_in_current_dir(tmp_path):
+@pytest.mark.xdist_group("cwd")
+@mock.patch.dict(os.environ, {}, clear=True)
+def test_load_dotenv_in_current_dir(tmp_path, monkeypatch):
     dotenv_path = tmp_path / '.env'
     dotenv_path.write_bytes(b'a=b')
     code_path = tmp_path / 'code.py'
     code_path.write_text(textwrap.dedent("""
         import dotenv
-        import os
 
         dotenv.load_dotenv(verbose=True)
-        print(os.environ['a'])
     """))
-    os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
 
-    result = sh.Command(sys.executable)(code_path)
+    runpy.run_path(str(code_path))
 
-    assert result == 'b\n'
+    assert os.environ['a'] == 'b'
 
 
 def test_dotenv_values_file(dotenv_path):
@@ -355,218 +375,232 @@ def test_dotenv_values_file(dotenv_path):
     assert result == {"a": "b"}
 
 
-@pytest.mark.parametrize(
-    "env,variables,override,expected",
-    [
-        ({"B": "c"}, {"a": "$B"}.items(), True, {"a": "$B"}),
-        ({"B": "c"}, {"a": "${B}"}.items(), False, {"a": "c"}),
+ResolveVariablesCase = Tuple[Iterable[Tuple[str, Optional[str]]], bool, Dict[str, Optional[str]]]
+RESOLVE_VARIABLES_CASES: Tuple[Tuple[Dict[str, str], Tuple[ResolveVariablesCase, ...]], ...] = (
+    ({"B": "c"}, (
+        ({"a": "$B"}.items(), True, {"a": "$B"}),
+        ({"a": "${B}"}.items(), False, {"a": "c"}),
 
-        ({"B": "c"}, [("B", "d"), ("a", "${B}")], False, {"a": "c", "B": "d"}),
-        ({"B": "c"}, [("B", "d"), ("a", "${B}")], True, {"a": "d", "B": "d"}),
+        ([("B", "d"), ("a", "${B}")], False, {"a": "c", "B": "d"}),
+        ([("B", "d"), ("a", "${B}")], True, {"a": "d", "B": "d"}),
 
-        ({"B": "c"}, [("B", "${X:-d}"), ("a", "${B}")], True, {"a": "d", "B": "d"}),
+        ([("B", "${X:-d}"), ("a", "${B}")], True, {"a": "d", "B": "d"}),
 
-        ({"B": "c"}, {"a": "x${B}y"}.items(), True, {"a": "xcy"}),
+        ({"a": "x${B}y"}.items(), True, {"a": "xcy"}),
 
         # Unfortunate sequence
-        ({"B": "c"}, [("C", "${B}"), ("B", "${A}"), ("A", "1")], True, {"C": "c", "B": "", "A": "1"}),
-        ({"B": "c"}, [("C", "${B}"), ("B", "${A}"), ("A", "1")], False, {"C": "c", "B": "", "A": "1"}),
+        ([("C", "${B}"), ("B", "${A}"), ("A", "1")], True, {"C": "c", "B": "", "A": "1"}),
+        ([("C", "${B}"), ("B", "${A}"), ("A", "1")], False, {"C": "c", "B": "", "A": "1"}),
 
-        ({"B": "c"}, [("B", "x"), ("B", "${B}"), ("B", "${B}")], True, {"B": "x"}),
-        ({"B": "c"}, [("B", "x"), ("B", "${B}"), ("B", "${B}")], False, {"B": "c"}),
-        ({"B": "c"}, [("B", "x"), ("B", "${B}"), ("B", "y")], False, {"B": "y"}),
-    ],
+        ([("B", "x"), ("B", "${B}"), ("B", "${B}")], True, {"B": "x"}),
+        ([("B", "x"), ("B", "${B}"), ("B", "${B}")], False, {"B": "c"}),
+        ([("B", "x"), ("B", "${B}"), ("B", "y")], False, {"B": "y"}),
+    )),
 )
-def test_resolve_variables(env, variables, override, expected):
-    with mock.patch.dict(os.environ, env, clear=True):
-        result = dotenv.main.resolve_variables(variables, override=override)
-        assert result == expected
 
 
-@pytest.mark.parametrize(
-    "env,variables,value,override,expected",
-    [
-        ({"B": "c"}, {"B": "d"}, "$B", True, "$B"),
-        ({"B": "c"}, {"B": "d"}, "${B}", True, "d"),
-        ({"B": "c"}, {"B": "d"}, "${B}", False, "c"),
+def test_resolve_variables():
+    for env, cases in RESOLVE_VARIABLES_CASES:
+        with mock.patch.dict(os.environ, env, clear=True):
+            for variables, override, expected in cases:
+                result = dotenv.main.resolve_variables(variables, override=override)
+                assert result == expected, (env, variables, override)
 
-        ({}, {"B": "d"}, "${B}", False, "d"),
-        ({"B": "c"}, {}, "${B}", True, "c"),
 
-        ({"B": "c"}, {"A": "d"}, "${B}${A}", True, "cd"),
+ResolveVariableCase = Tuple[Dict[str, Optional[str]], str, bool, str]
+RESOLVE_VARIABLE_CASES: Tuple[Tuple[Dict[str, str], Tuple[ResolveVariableCase, ...]], ...] = (
+    ({"B": "c"}, (
+        ({"B": "d"}, "$B", True, "$B"),
+        ({"B": "d"}, "${B}", True, "d"),
+        ({"B": "d"}, "${B}", False, "c"),
 
-        ({"B": "c"}, {"B": "d"}, "$B$B$B", True, "$B$B$B"),
-        ({"B": "c"}, {"B": "d"}, "${B}${B}${B}", True, "ddd"),
-        ({"B": "c"}, {"B": "d"}, "${B}${B}${B}", False, "ccc"),
+        ({}, "${B}", True, "c"),
 
-        ({"B": "c"}, {"B": "d"}, "${C}", False, ""),
-        ({"B": "c"}, {"B": "d"}, "${C}", True, ""),
-        ({"B": "c"}, {"B": "d"}, "${C}${C}${C}", True, ""),
-        ({"B": "c"}, {"B": "d"}, "${C}a${C}b${C}", True, "ab"),
-    ],
-)
-def test_resolve_variable(env, variables, value, override, expected):
-    with mock.patch.dict(os.environ, env, clear=True):
-        result = dotenv.main.resolve_variable(value, variables, override=override)
-        assert result == expected
+        ({"A": "d"}, "${B}${A}", True, "cd"),
 
+        ({"B": "d"}, "$B$B$B", True, "$B$B$B"),
+        ({"B": "d"}, "${B}${B}${B}", True, "ddd"),
+        ({"B": "d"}, "${B}${B}${B}", False, "ccc"),
 
-@pytest.mark.parametrize(
-    "env,string,interpolate,expected",
-    [
-        # Use uppercase when setting up the env to be compatible with Windows
+        ({"B": "d"}, "${C}", False, ""),
+        ({"B": "d"}, "${C}", True, ""),
+        ({"B": "d"}, "${C}${C}${C}", True, ""),
+        ({"B": "d"}, "${C}a${C}b${C}", True, "ab"),
+    )),
+    ({}, (
+        ({"B": "d"}, "${B}", False, "d"),
+    )),
+)
 
-        # Defined in environment, with and without interpolation
-        ({"B": "c"}, "a=$B", False, {"a": "$B"}),
-        ({"B": "c"}, "a=$B", True, {"a": "$B"}),
-        ({"B": "c"}, "a=${B}", False, {"a": "${B}"}),
-        ({"B": "c"}, "a=${B}", True, {"a": "c"}),
-        ({"B": "c"}, "a=${B:-d}", False, {"a": "${B:-d}"}),
-        ({"B": "c"}, "a=${B:-d}", True, {"a": "c"}),
 
-        # Defined in file
-        ({}, "b=c\na=${b}", True, {"a": "c", "b": "c"}),
+def test_resolve_variable():
+    for env, cases in RESOLVE_VARIABLE_CASES:
+        with mock.patch.dict(os.environ, env, clear=True):
+            for variables, value, override, expected in cases:
+                result = dotenv.main.resolve_variable(value, variables, override=override)
+                assert result == expected, (env, variables, value, override)
 
-        # Undefined
-        ({}, "a=${b}", True, {"a": ""}),
-        ({}, "a=${b:-d}", True, {"a": "d"}),
+
+# Use uppercase when setting up the env to be compatible with Windows
+DotenvValuesCase = Tuple[str, bool, Dict[str, Optional[str]]]
+DOTENV_VALUES_STRING_IO_CASES: Tuple[Tuple[Dict[str, str], Tuple[DotenvValuesCase, ...]], ...] = (
+    ({"B": "c"}, (
+        # Defined in environment, with and without interpolation
+        ("a=$B", False, {"a": "$B"}),
+        ("a=$B", True, {"a": "$B"}),
+        ("a=${B}", False, {"a": "${B}"}),
+        ("a=${B}", True, {"a": "c"}),
+        ("a=${B:-d}", False, {"a": "${B:-d}"}),
+        ("a=${B:-d}", True, {"a": "c"}),
 
         # With quotes
-        ({"B": "c"}, 'a="${B}"', True, {"a": "c"}),
-        ({"B": "c"}, "a='${B}'", True, {"a": "c"}),
+        ('a="${B}"', True, {"a": "c"}),
+        ("a='${B}'", True, {"a": "c"}),
 
         # With surrounding text
-        ({"B": "c"}, "a=x${B}y", True, {"a": "xcy"}),
-
-        # Self-referential
-        ({"A": "b"}, "A=${A}", True, {"A": "b"}),
-        ({}, "a=${a}", True, {"a": ""}),
-        ({"A": "b"}, "A=${A:-c}", True, {"A": "b"}),
-        ({}, "a=${a:-c}", True, {"a": "c"}),
+        ("a=x${B}y", True, {"a": "xcy"}),
 
         # Reused
-        ({"B": "c"}, "a=${B}${B}", True, {"a": "cc"}),
+        ("a=${B}${B}", True, {"a": "cc"}),
 
         # Re-defined and used in file
-        ({"B": "c"}, "B=d\na=${B}", True, {"a": "d", "B": "d"}),
-        ({}, "a=b\na=c\nd=${a}", True, {"a": "c", "d": "c"}),
-        ({}, "a=b\nc=${a}\nd=e\nc=${d}", True, {"a": "b", "c": "e", "d": "e"}),
+        ("B=d\na=${B}", True, {"a": "d", "B": "d"}),
+    )),
+    ({}, (
+        # Defined in file
+        ("b=c\na=${b}", True, {"a": "c", "b": "c"}),
+
+        # Undefined
+        ("a=${b}", True, {"a": ""}),
+        ("a=${b:-d}", True, {"a": "d"}),
+
+        # Self-referential
+        ("a=${a}", True, {"a": ""}),
+        ("a=${a:-c}", True, {"a": "c"}),
+
+        # Re-defined and used in file
+        ("a=b\na=c\nd=${a}", True, {"a": "c", "d": "c"}),
+        ("a=b\nc=${a}\nd=e\nc=${d}", True, {"a": "b", "c": "e", "d": "e"}),
 
         # No value
-        ({}, "a\nb=${a}", True, {"a": None, "b": ""}),
-        ({}, "a\nb=${a}", False, {"a": None, "b": "${a}"}),
-    ],
+        ("a\nb=${a}", True, {"a": None, "b": ""}),
+        ("a\nb=${a}", False, {"a": None, "b": "${a}"}),
+    )),
+    ({"A": "b"}, (
+        # Self-referential
+        ("A=${A}", True, {"A": "b"}),
+        ("A=${A:-c}", True, {"A": "b"}),
+    )),
 )
-def test_dotenv_values_string_io(env, string, interpolate, expected):
-    with mock.patch.dict(os.environ, env, clear=True):
-        stream = io.StringIO(string)
-        stream.seek(0)
 
-        result = dotenv.dotenv_values(stream=stream, interpolate=interpolate)
 
-        assert result == expected
+def test_dotenv_values_string_io():
+    for env, cases in DOTENV_VALUES_STRING_IO_CASES:
+        with mock.patch.dict(os.environ, env, clear=True):
+            for string, interpolate, expected in cases:
+                stream = io.StringIO(string)
+
+                result = dotenv.dotenv_values(stream=stream, interpolate=interpolate)
+
+                assert result == expected, (env, string, interpolate)
+
 
+VARIABLE_EXPANSIONS_CASES = (
+    ("XX=${NOT_DEFINED-ok}", "ok"),
+    ("XX=${NOT_DEFINED:-ok}", "ok"),
+    ("XX=${EMPTY-ok}", ""),
+    ("XX=${EMPTY:-ok}", "ok"),
+    ("XX=${TEST-ok}", "tt"),
+    ("XX=${TEST:-ok}",  "tt"),
 
-@pytest.mark.parametrize(
-    "string,expected_xx",
-    [
-        ("XX=${NOT_DEFINED-ok}", "ok"),
-        ("XX=${NOT_DEFINED:-ok}", "ok"),
-        ("XX=${EMPTY-ok}", ""),
-        ("XX=${EMPTY:-ok}", "ok"),
-        ("XX=${TEST-ok}", "tt"),
-        ("XX=${TEST:-ok}",  "tt"),
-
-        ("XX=${NOT_DEFINED+ok}", ""),
-        ("XX=${NOT_DEFINED:+ok}", ""),
-        ("XX=${EMPTY+ok}",  "ok"),
-        ("XX=${EMPTY:+ok}",  ""),
-        ("XX=${TEST+ok}", "ok"),
-        ("XX=${TEST:+ok}", "ok"),
-
-        ("XX=${EMPTY?no throw}", ""),
-        ("XX=${TEST?no throw}",  "tt"),
-        ("XX=${TEST:?no throw}",  "tt"),
-    ],
+    ("XX=${NOT_DEFINED+ok}", ""),
+    ("XX=${NOT_DEFINED:+ok}", ""),
+    ("XX=${EMPTY+ok}",  "ok"),
+    ("XX=${EMPTY:+ok}",  ""),
+    ("XX=${TEST+ok}", "ok"),
+    ("XX=${TEST:+ok}", "ok"),
+
+    ("XX=${EMPTY?no throw}", ""),
+    ("XX=${TEST?no throw}",  "tt"),
+    ("XX=${TEST:?no throw}",  "tt"),
 )
-def test_variable_expansions(string, expected_xx):
+
+
+def test_variable_expansions():
     test_env = {"TEST": "tt", "EMPTY": "", }
     with mock.patch.dict(os.environ, test_env, clear=True):
-        stream = io.StringIO(string)
-        stream.seek(0)
+        for string, expected_xx in VARIABLE_EXPANSIONS_CASES:
+            stream = io.StringIO(string)
 
-        result = dotenv.dotenv_values(stream=stream, interpolate=True)
+            result = dotenv.dotenv_values(stream=stream, interpolate=True)
 
-        assert result["XX"] == expected_xx
+            assert result["XX"] == expected_xx, string
 
 
-@pytest.mark.parametrize(
-    "string,message",
-    [
-        ("XX=${EMPTY:?throw}", "EMPTY: throw"),
-        ("XX=${NOT_DEFINED:?throw}", "NOT_DEFINED: throw"),
-        ("XX=${NOT_DEFINED?throw}", "NOT_DEFINED: throw"),
-    ],
+REQUIRED_VARIABLE_THROWS_CASES = (
+    ("XX=${EMPTY:?throw}", "EMPTY: throw"),
+    ("XX=${NOT_DEFINED:?throw}", "NOT_DEFINED: throw"),
+    ("XX=${NOT_DEFINED?throw}", "NOT_DEFINED: throw"),
 )
+
+
+@pytest.mark.parametrize("string,message", REQUIRED_VARIABLE_THROWS_CASES)
 def test_required_variable_throws(string, message):
     test_env = {"TEST": "tt", "EMPTY": "", }
     with mock.patch.dict(os.environ, test_env, clear=True):
         stream = io.StringIO(string)
-        stream.seek(0)
 
         with pytest.raises(LookupError, match=message):
             dotenv.dotenv_values(stream=stream, interpolate=True)
 
 
-@pytest.mark.parametrize(
-    "string,expected_xx",
-    [
-        ("XX=TEST", "TEST"),
-        ("XX=\"TE\"ST", "TEST"),
-        ("XX='TE\'ST", "TEST"),
-        ("XX=\"TE\"'ST'", "TEST"),
-        ("XX=TE'ST'", "TEST"),
-        ("XX=TE\"ST\"", "TEST"),
-        ("XX=TE ST", "TE ST"),
-        ("XX=TE \"ST\"", "TE ST"),
-        ("XX=$TEST", "$TEST"),
-        ("XX=${TEST}", "tt"),
-        ("XX=\"${TEST}\"", "tt"),
-        ("XX='${TEST}'", "tt"),
-        ("XX='$TEST'", "$TEST"),
-        ("XX='\\$\\{TEST\\}'", "\\$\\{TEST\\}"),
-        ("XX=\\$\\{TEST\\}", "\\$\\{TEST\\}"),
-        ("XX=\"\\$\\{TEST\\}\"", "\\$\\{TEST\\}"),
-    ],
+DOCUMENT_EXPANSIONS_CASES = (
+    ("XX=TEST", "TEST"),
+    ("XX=\"TE\"ST", "TEST"),
+    ("XX='TE\'ST", "TEST"),
+    ("XX=\"TE\"'ST'", "TEST"),
+    ("XX=TE'ST'", "TEST"),
+    ("XX=TE\"ST\"", "TEST"),
+    ("XX=TE ST", "TE ST"),
+    ("XX=TE \"ST\"", "TE ST"),
+    ("XX=$TEST", "$TEST"),
+    ("XX=${TEST}", "tt"),
+    ("XX=\"${TEST}\"", "tt"),
+    ("XX='${TEST}'", "tt"),
+    ("XX='$TEST'", "$TEST"),
+    ("XX='\\$\\{TEST\\}'", "\\$\\{TEST\\}"),
+    ("XX=\\$\\{TEST\\}", "\\$\\{TEST\\}"),
+    ("XX=\"\\$\\{TEST\\}\"", "\\$\\{TEST\\}"),
 )
-def test_document_expansions(string, expected_xx):
+
+
+def test_document_expansions():
     test_env = {"TEST": "tt"}
     with mock.patch.dict(os.environ, test_env, clear=True):
-        stream = io.StringIO(string)
-        stream.seek(0)
+        for string, expected_xx in DOCUMENT_EXPANSIONS_CASES:
+            stream = io.StringIO(string)
 
-        result = dotenv.dotenv_values(stream=stream, interpolate=True)
+            result = dotenv.dotenv_values(stream=stream, interpolate=True)
 
-        assert result["XX"] == expected_xx
+            assert result["XX"] == expected_xx, string
 
 
-@pytest.mark.parametrize(
-    "string,expected_xx",
-    [
-        ("XX=${TEST}", "tt"),
-        ("XX=\"${TEST}\"", "tt"),
-        ("XX='${TEST}'", "${TEST}"),
-    ],
+SINGLE_QUOTE_EXPANSIONS_CASES = (
+    ("XX=${TEST}", "tt"),
+    ("XX=\"${TEST}\"", "tt"),
+    ("XX='${TEST}'", "${TEST}"),
 )
-def test_single_quote_expansions(string, expected_xx):
+
+
+def test_single_quote_expansions():
     test_env = {"TEST": "tt"}
     with mock.patch.dict(os.environ, test_env, clear=True):
-        stream = io.StringIO(string)
-        stream.seek(0)
+        for string, expected_xx in SINGLE_QUOTE_EXPANSIONS_CASES:
+            stream = io.StringIO(string)
 
-        result = dotenv.dotenv_values(stream=stream, interpolate=True, single_quotes_expand=False)
+            result = dotenv.dotenv_values(stream=stream, interpolate=True, single_quotes_expand=False)
 
-        assert result["XX"] == expected_xx
+            assert result["XX"] == expected_xx, string
 
 
 def test_dotenv_values_file_stream(dotenv_path):
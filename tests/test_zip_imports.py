@@ -69,7 +69,7 @@ def test_load_dotenv_gracefully_handles_zip_imports_when_no_env_file(tmp_path):
 
 
 @pytest.mark.skipif(not with_sh, reason="sh module is not available")
-def test_load_dotenv_outside_zip_file_when_called_in_zipfile(tmp_path):
+def test_load_dotenv_outside_zip_file_when_called_in_zipfile(tmp_path, monkeypatch):
     zip_file_path = setup_zipfile(
         tmp_path,
         [
@@ -102,7 +102,7 @@ def test_load_dotenv_outside_zip_file_when_called_in_zipfile(tmp_path):
     """
         )
     )
-    os.chdir(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
 
     result = sh.Command(sys.executable)(code_path)
 